@@ -1,10 +1,13 @@
 from fastapi import APIRouter, HTTPException, Depends
-from typing import List, Dict, Any
+from fastapi.responses import StreamingResponse
+from typing import List, Dict, Any, Iterator
+import orjson
 from app.schemas.response_schema import StandardResponse
 from app.schemas.response.documentation_schema import DocumentationSummary, DocumentationFull
 from app.services.documentation_service import (
     get_all_documentations_from_db, 
     get_record_from_database,
+    iter_record_components,
     convert_dicts_to_code_components
 )
 from app.schemas.response.analyze_schema import  GenerateResultResponse, GenerateResultRequest
@@ -69,6 +72,39 @@ async def get_documentation_by_id(doc_id: str):
             detail=f"Terjadi kesalahan: {e}"
         )
         
+@router.get(
+    "/{doc_id}/stream",
+    summary="Stream Full Documentation Components as NDJSON"
+)
+def stream_documentation_by_id(doc_id: str):
+    """
+    Mengirim komponen dokumentasi satu per satu dalam format NDJSON
+    (satu objek JSON per baris), sehingga dokumen besar tidak perlu
+    di-encode menjadi satu body JSON utuh.
+    Endpoint sinkron (dijalankan FastAPI di threadpool) karena pymongo blocking;
+    komponen dibaca lewat cursor sambil dikirim.
+    """
+    try:
+        components = iter_record_components(doc_id)
+    except Exception as e:
+        print(f"[ERROR] Gagal mengambil dokumentasi {doc_id}: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Terjadi kesalahan internal saat mengambil data: {e}"
+        )
+
+    if components is None:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Dokumentasi dengan ID '{doc_id}' tidak ditemukan."
+        )
+
+    def _generate_ndjson() -> Iterator[bytes]:
+        for component in components:
+            yield orjson.dumps(component) + b"\n"
+
+    return StreamingResponse(_generate_ndjson(), media_type="application/x-ndjson")
+
 @router.post(
     "/{process_id}/generate-result",
     response_model=StandardResponse[GenerateResultResponse],
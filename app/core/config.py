@@ -17,11 +17,13 @@ class Settings(BaseSettings):
     
     MONGO_URI: str = "mongodb://localhost:27017/"
     MONGO_DATABASE: str = "dg_project"
+    MONGO_MAX_POOL_SIZE: int = 50
 
     REDIS_USERNAME: str = "default"
     REDIS_PASSWORD: str = "******"
 
     PYCG_PYTHON_EXECUTABLE: str = "python -3.9"
+    PYCG_SAFETY_CHECK_WORKERS: int = 4
 
 # Membuat instance tunggal dari Settings yang akan digunakan di seluruh aplikasi
 settings = Settings()
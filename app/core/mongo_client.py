@@ -7,7 +7,8 @@ def connect_to_mongo():
     """Inisialisasi koneksi MongoDB."""
     global client
     if client is None:
-        client = MongoClient(settings.MONGO_URI)
+        # Satu client (connection pool) dipakai bersama seluruh proses
+        client = MongoClient(settings.MONGO_URI, maxPoolSize=settings.MONGO_MAX_POOL_SIZE)
         client.admin.command('ping')
         print("MongoDB: Koneksi berhasil!")
 
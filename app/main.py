@@ -10,10 +10,11 @@ from app.core.config import UPLOAD_DIRECTORY, GRAPH_VISUALIZATION_DIRECTORY, DOC
 from contextlib import asynccontextmanager
 from app.core.redis_client import get_redis_client
 from starlette.requests import Request
-from starlette.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
 from starlette.exceptions import HTTPException as StarletteHTTPException
-from app.schemas.response_schema import StandardResponse, ErrorDetail
+from app.schemas.response_schema import current_timestamp
 from app.core.mongo_client import connect_to_mongo, close_mongo_connection
+from app.services.documentation_service import ensure_component_indexes
 from fastapi.staticfiles import StaticFiles
 
 import redis
@@ -41,6 +42,7 @@ async def lifespan(app: FastAPI):
         
     try:
         connect_to_mongo()
+        ensure_component_indexes()
         print("✅ MongoDB connection successful!")
     except Exception as e:
         print(f"❌ MongoDB connection failed: {e}")
@@ -61,22 +63,20 @@ app = FastAPI(
 )
 
 # --- ERROR HANDLING ---
+# Bentuk body error sama dengan StandardResponse(success=False).model_dump(exclude_none=True),
+# tetapi disusun langsung sebagai dict agar path error tidak melalui validasi Pydantic.
 @app.exception_handler(StarletteHTTPException)
 async def http_exception_handler(request: Request, exc: StarletteHTTPException):
-    error_response = StandardResponse(
-        success=False,
-        error=ErrorDetail(
-            code=exc.status_code,
-            type=exc.__class__.__name__, # Misal: 'HTTPException', 'NotFoundException'
-            message=str(exc.detail)
-        )
-    )
-    return JSONResponse(
-        status_code=exc.status_code,
-        # model_dump() mengubah Pydantic model menjadi dictionary
-        # exclude_none=True agar field 'data' yang kosong tidak dikirim
-        content=error_response.model_dump(exclude_none=True)
-    )
+    body = {
+        "success": False,
+        "error": {
+            "code": exc.status_code,
+            "type": exc.__class__.__name__, # Misal: 'HTTPException', 'NotFoundException'
+            "message": str(exc.detail)
+        },
+        "meta": {"timestamp": current_timestamp().isoformat()}
+    }
+    return ORJSONResponse(body, status_code=exc.status_code)
 
 # --- KONFIGURASI CORS ---
 origins = [
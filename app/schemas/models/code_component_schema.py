@@ -3,7 +3,7 @@ from dataclasses import dataclass, field
 from typing import Dict, List, Optional, Set, Any
 from enum import Enum
 
-@dataclass
+@dataclass(slots=True)
 class CodeComponent:
     """
     Represents a single code component (function, class, or method) in a Python codebase.
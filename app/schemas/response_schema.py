@@ -3,10 +3,26 @@
 from pydantic import BaseModel, Field
 from typing import Generic, TypeVar, Optional
 from datetime import datetime, timezone
+import time
 
 # Tipe Generik untuk payload data, agar bisa di-reuse
 DataType = TypeVar('DataType')
 
+# Timestamp metadata cukup beresolusi detik; nilai di-cache dan hanya
+# diperbarui jika sudah lewat _TIMESTAMP_REFRESH_SECONDS (jam monotonic).
+_TIMESTAMP_REFRESH_SECONDS = 0.5
+_cached_timestamp: datetime = datetime.now(timezone.utc)
+_cached_timestamp_at: float = time.monotonic()
+
+def current_timestamp() -> datetime:
+    """Mengembalikan waktu UTC saat ini dari cache beresolusi detik."""
+    global _cached_timestamp, _cached_timestamp_at
+    now = time.monotonic()
+    if now - _cached_timestamp_at >= _TIMESTAMP_REFRESH_SECONDS:
+        _cached_timestamp = datetime.now(timezone.utc)
+        _cached_timestamp_at = now
+    return _cached_timestamp
+
 class ErrorDetail(BaseModel):
     """Skema detail untuk respons error."""
     code: int
@@ -15,7 +31,7 @@ class ErrorDetail(BaseModel):
 
 class Meta(BaseModel):
     """Skema untuk metadata respons."""
-    timestamp: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    timestamp: datetime = Field(default_factory=current_timestamp)
 
 class StandardResponse(BaseModel, Generic[DataType]):
     """
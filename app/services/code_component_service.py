@@ -1,111 +1,120 @@
-from typing import List, Dict, Any, Optional, Union, Tuple
+from typing import List, Dict, Any, Optional, Tuple
+from collections import OrderedDict
 import ast
+import threading
 from app.schemas.models.code_component_schema import CodeComponent
-from app.services.documentation_service import get_record_from_database, convert_dicts_to_code_components
+from app.services.documentation_service import (
+    get_record_from_database,
+    convert_dicts_to_code_components,
+    COMPONENT_HYDRATION_PROJECTION
+)
 import os
 
-import ast
-from typing import Optional, List, Dict, Any
+# (start_line, end_line) -> node definisi (fungsi, kelas, method)
+DefinitionIndex = Dict[Tuple[int, int], ast.AST]
+# Isi cache per file: (Tree, Baris Source, Index Definisi)
+ParsedFileEntry = Tuple[ast.Module, List[str], DefinitionIndex]
 
+_DEFINITION_NODE_TYPES = (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)
+_BLOCK_NODE_TYPES = (ast.stmt, ast.excepthandler, ast.match_case)
 
-class NodeFinder(ast.NodeVisitor):
-    """
-    Visitor ini mencari satu node spesifik (fungsi, kelas, method)
-    berdasarkan rentang baris yang *tepat* (termasuk logika decorator Anda).
-    """
-    def __init__(self, target_start: int, target_end: int):
-        self.target_start = target_start
-        self.target_end = target_end
-        self.found_node: Optional[ast.AST] = None
-
-    def _check_node(self, node: ast.AST):
-        # Jika kita sudah menemukan node, hentikan pencarian lebih dalam
-        if self.found_node:
-            return
-
-        # ---- LOGIKA KUNCI (Sesuai instruksi Anda) ----
-        node_start_line = node.decorator_list[0].lineno if node.decorator_list else node.lineno
-        node_end_line = getattr(node, "end_lineno", node.lineno)
-        # ----------------------------------------------
-
-        if (node_start_line == self.target_start and
-            node_end_line == self.target_end):
-            
-            self.found_node = node
+# Cache AST lintas request: (path, mtime_ns, size) -> ParsedFileEntry
+_AST_CACHE_MAXSIZE = 256
+_AST_CACHE: "OrderedDict[Tuple[str, int, int], Optional[ParsedFileEntry]]" = OrderedDict()
+# Endpoint sinkron berjalan di threadpool, jadi akses OrderedDict harus dikunci
+_AST_CACHE_LOCK = threading.Lock()
 
-    def visit_FunctionDef(self, node: ast.FunctionDef):
-        self._check_node(node)
-        self.generic_visit(node) # Tetap kunjungi nested function
 
-    def visit_AsyncFunctionDef(self, node: ast.AsyncFunctionDef):
-        self._check_node(node)
-        self.generic_visit(node)
+def _build_definition_index(tree: ast.Module) -> DefinitionIndex:
+    """
+    Membangun index node definisi (fungsi, kelas, method) berdasarkan rentang
+    baris, sekali per file. Rentang dihitung dengan logika decorator yang sama:
+    baris awal = decorator pertama jika ada, baris akhir = end_lineno.
 
-    def visit_ClassDef(self, node: ast.ClassDef):
-        self._check_node(node)
-        self.generic_visit(node) # Kunjungi method/class di dalam class ini
+    Traversal pre-order dan entry pertama dipertahankan, sehingga hasilnya sama
+    dengan pencarian rekursif per komponen. Hanya node statement/blok yang
+    dikunjungi karena definisi tidak pernah berada di dalam ekspresi.
+    """
+    index: DefinitionIndex = {}
+    stack: List[ast.AST] = [tree]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, _DEFINITION_NODE_TYPES):
+            node_start_line: int = node.decorator_list[0].lineno if node.decorator_list else node.lineno
+            node_end_line: int = getattr(node, "end_lineno", node.lineno)
+            index.setdefault((node_start_line, node_end_line), node)
 
-    def find(self, tree: ast.Module) -> Optional[ast.AST]:
-        """Metode helper untuk menjalankan visitor dan mengembalikan hasil."""
-        self.visit(tree)
-        return self.found_node
+        children = [child for child in ast.iter_child_nodes(node) if isinstance(child, _BLOCK_NODE_TYPES)]
+        children.reverse()
+        stack.extend(children)
+    return index
 
 
 # --- 3. Logika Inti: Hidrasi AST ---
-def source_code_getter(source: str, start_line: int, end_line: int) -> str:
-    """Get source code segment for an AST node."""
+def source_code_getter(source_lines: List[str], start_line: int, end_line: int) -> str:
+    """Get source code segment for an AST node from the pre-split file lines."""
     try:
-        # Fallback to manual extraction
-        lines = source.splitlines()
         # Koreksi: pastikan kita mengambil baris *termasuk* end_line
-        segment_lines = lines[start_line - 1:end_line] 
+        segment_lines = source_lines[start_line - 1:end_line] 
         return "\n".join(segment_lines)
     
     except Exception as e:
         print(f"[SOURCE GETTER] Error getting source segment: {e}")
         return ""
 
-def _get_ast_tree_from_cache(
-    file_path: str, 
-    # REVISI 1: Tipe cache diubah untuk menyimpan (Tree, Source String)
-    ast_cache: Dict[str, Optional[Tuple[ast.Module, str]]]
-) -> Optional[Tuple[ast.Module, str]]:
+def _get_ast_tree_from_cache(file_path: str) -> Optional[ParsedFileEntry]:
     """
-    Membaca, mem-parse, dan menyimpan AST *dan* source string file dalam cache.
-    Mengembalikan tuple (ast.Module, str) atau None jika gagal.
+    Membaca, mem-parse, dan menyimpan AST, baris source, dan index definisi
+    file dalam cache LRU tingkat proses.
+    Key cache adalah (path, mtime_ns, size), sehingga file yang berubah
+    otomatis di-parse ulang. Akses cache dijaga _AST_CACHE_LOCK; parsing
+    dilakukan di luar lock. Mengembalikan tuple (ast.Module, List[str],
+    DefinitionIndex) atau None jika gagal.
     """
+    try:
+        stat_result = os.stat(file_path)
+    except OSError:
+        print(f"[AST ERROR] File tidak ditemukan: {file_path}")
+        return None
+
+    cache_key = (file_path, stat_result.st_mtime_ns, stat_result.st_size)
+
     # 1. Cek apakah sudah ada di cache
-    if file_path not in ast_cache:
-        try:
-            if not os.path.exists(file_path):
-                print(f"[AST ERROR] File tidak ditemukan: {file_path}")
-                ast_cache[file_path] = None
-                return None
-
-            # Baca dan parse file
-            with open(file_path, 'r', encoding='utf-8') as f:
-                source_code = f.read() # <-- Simpan source string
-            
-            parsed_tree = ast.parse(source_code, filename=file_path)
-            
-            # REVISI 2: Simpan tuple (Tree, Source) ke cache
-            ast_cache[file_path] = (parsed_tree, source_code)
-        
-        except Exception as e:
-            print(f"[AST ERROR] Gagal mem-parse {file_path}: {e}")
-            ast_cache[file_path] = None
-            return None
-    
-    # 2. Kembalikan dari cache
-    return ast_cache[file_path]
+    with _AST_CACHE_LOCK:
+        if cache_key in _AST_CACHE:
+            _AST_CACHE.move_to_end(cache_key)
+            return _AST_CACHE[cache_key]
+
+    try:
+        # Baca dan parse file
+        with open(file_path, 'r', encoding='utf-8') as f:
+            source_code = f.read() # <-- Simpan source string
+
+        parsed_tree = ast.parse(source_code, filename=file_path)
+
+        # Simpan tuple (Tree, Baris Source, Index) ke cache; split baris sekali per file
+        cache_entry: Optional[ParsedFileEntry] = (parsed_tree, source_code.splitlines(), _build_definition_index(parsed_tree))
+
+    except Exception as e:
+        print(f"[AST ERROR] Gagal mem-parse {file_path}: {e}")
+        cache_entry = None
+
+    # 2. Simpan ke cache dan buang entry yang paling lama tidak dipakai
+    with _AST_CACHE_LOCK:
+        _AST_CACHE[cache_key] = cache_entry
+        _AST_CACHE.move_to_end(cache_key)
+        if len(_AST_CACHE) > _AST_CACHE_MAXSIZE:
+            _AST_CACHE.popitem(last=False)
+
+    return cache_entry
 
 def hydrate_components_with_ast(
     components: List[CodeComponent],
     root_folder_path: str
 ) -> List[CodeComponent]:
     
-    # REVISI 1: Tipe cache diubah
-    ast_cache: Dict[str, Optional[Tuple[ast.Module, str]]] = {}
+    # Hasil per file untuk pemanggilan ini (menghindari os.stat per komponen)
+    file_entries: Dict[str, Optional[ParsedFileEntry]] = {}
     hydrated_list: List[CodeComponent] = []
 
     for comp in components:
@@ -116,7 +125,9 @@ def hydrate_components_with_ast(
         absolute_file_path = os.path.join(root_folder_path, comp.relative_path)
         
         # REVISI 2: Ambil hasil cache (sekarang berupa tuple atau None)
-        cache_result = _get_ast_tree_from_cache(absolute_file_path, ast_cache)
+        if absolute_file_path not in file_entries:
+            file_entries[absolute_file_path] = _get_ast_tree_from_cache(absolute_file_path)
+        cache_result = file_entries[absolute_file_path]
 
         # Jika file gagal di-parse, lewati komponen ini
         if cache_result is None:
@@ -125,17 +136,16 @@ def hydrate_components_with_ast(
             continue
         
         # REVISI 3: Bongkar tuple hasil cache
-        full_ast_tree, source_code_string = cache_result
+        _, source_lines, definition_index = cache_result
         
-        # 2. Cari node spesifik di dalam pohon AST tersebut
-        finder = NodeFinder(target_start=comp.start_line, target_end=comp.end_line)
-        found_node = finder.find(full_ast_tree)
+        # 2. Cari node spesifik lewat index rentang baris file tersebut
+        found_node = definition_index.get((comp.start_line, comp.end_line))
 
         # 3. "Hidrasi" objek komponen
         if found_node:
             # --- REVISI 4: Panggil source_code_getter ---
             comp.source_code = source_code_getter(
-                source=source_code_string,
+                source_lines=source_lines,
                 start_line=comp.start_line,
                 end_line=comp.end_line
             )
@@ -160,7 +170,8 @@ def get_hydrated_components_for_record(
     record_doc = get_record_from_database(
         record_code=record_code, 
         collection=collection,
-        sidebar_mode=False 
+        sidebar_mode=False,
+        projection=COMPONENT_HYDRATION_PROJECTION
     )
     
     if not record_doc or 'components' not in record_doc:
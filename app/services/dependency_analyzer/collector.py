@@ -9,27 +9,47 @@ from app.utils.CustomLogger import CustomLogger
 logger = CustomLogger("Collector")
 
 # Built-in Python types and modules that should be excluded from dependencies
-BUILTIN_TYPES = {name for name in dir(builtins)}
-STANDARD_MODULES = {
+BUILTIN_TYPES = frozenset(dir(builtins))
+STANDARD_MODULES = frozenset({
     'abc', 'argparse', 'array', 'asyncio', 'base64', 'collections', 'copy', 
     'csv', 'datetime', 'enum', 'functools', 'glob', 'io', 'itertools', 
     'json', 'logging', 'math', 'os', 'pathlib', 'random', 're', 'shutil', 
     'string', 'sys', 'time', 'typing', 'uuid', 'warnings', 'xml'
-}
-EXCLUDED_NAMES = {'self', 'cls'}
+})
+EXCLUDED_NAMES = frozenset({'self', 'cls'})
+
+# Gabungan semua nama yang dilewati, agar _add_dependency cukup satu kali cek
+_SKIP_NAMES = BUILTIN_TYPES | STANDARD_MODULES | EXCLUDED_NAMES
 
 class ImportCollector(ast.NodeVisitor):
     """Collects secondary import statements from Python code."""
+
+    _BLOCK_FIELDS = ('body', 'handlers', 'orelse', 'finalbody', 'cases')
+    _BLOCK_NODE_TYPES = (ast.stmt, ast.excepthandler, ast.match_case)
     
     def __init__(self):
         self.imports = {}
         self.wildcard_modules = []
+
+    def visit(self, node):
+        # Satu lookup dict per node, menggantikan getattr('visit_' + nama kelas)
+        visitor = self._DISPATCH.get(type(node))
+        if visitor is not None:
+            return visitor(self, node)
+        return self.generic_visit(node)
+
+    def generic_visit(self, node):
+        # Import hanya bisa muncul sebagai statement, jadi cukup turun ke
+        # field yang berisi blok statement (termasuk handler except & case match)
+        for field in self._BLOCK_FIELDS:
+            for child in getattr(node, field, None) or ():
+                if isinstance(child, self._BLOCK_NODE_TYPES):
+                    self.visit(child)
     
     def visit_Import(self, node: ast.Import):
         for alias in node.names:
             name = alias.asname or alias.name
             self.imports[name] = alias.name
-        self.generic_visit(node)
 
     def visit_ImportFrom(self, node: ast.ImportFrom):
         modname = node.module
@@ -41,8 +61,12 @@ class ImportCollector(ast.NodeVisitor):
                 else:
                     name = alias.asname or alias.name
                     self.imports[name] = f"{modname}.{alias.name}" # Simpan sebagai 'modul.nama_asli'
-        
-        self.generic_visit(node)
+
+    # Tabel dispatch tipe node -> visitor, dibangun sekali per kelas
+    _DISPATCH = {
+        ast.Import: visit_Import,
+        ast.ImportFrom: visit_ImportFrom,
+    }
 
 class DependencyCollector(ast.NodeVisitor):
     """
@@ -50,10 +74,15 @@ class DependencyCollector(ast.NodeVisitor):
     attribute access, function calls, and class references.
     """
     
-    def __init__(self, imports, wildcard_modules, current_module, repo_modules, repo_path):
+    def __init__(self, imports, wildcard_modules, current_module, repo_modules, repo_path,
+                 known_components=None, module_prefixes=None, wildcard_cache=None):
         self.imports = imports
         self.wildcard_symbols = {}
+        # Cache simbol wildcard per modname; dibuat per analisis oleh resolver
+        # dan dibagi ke semua collector dalam pass yang sama
+        self._wildcard_cache = wildcard_cache if wildcard_cache is not None else {}
         self.repo_path = repo_path
+        self._repo_path_str = str(repo_path)
         self.path_changed = False
         self._solve_wildcard_symbol(wildcard_modules)
 
@@ -62,42 +91,73 @@ class DependencyCollector(ast.NodeVisitor):
         self.dependencies = set()
         self._current_class = None
 
+        # Method yang dipanggil per referensi nama, di-bind sekali di sini
+        self._dep_add = self.dependencies.add
+        self._imports_get = self.imports.get
+        self._wildcard_get = self.wildcard_symbols.get
+
+        # Filter opsional: jika diberikan, hanya nama yang merupakan komponen
+        # repo atau berawalan root modul repo yang dicatat sebagai dependensi
+        self._known_components = known_components
+        self._module_prefixes = module_prefixes
+
         # Track local variables defined in the current context
         self.local_variables = set()
 
         # Track local variables as aliases
         self.local_aliases = {}
 
-        # print(f"Imports: {self.imports}")
-        # print(f"Wildcard Symbols: {self.wildcard_symbols}\n")
-
     def _solve_wildcard_symbol(self, wildcard_modules):
-        self._change_to_target_path_path(self.repo_path)
+        # Diproses berurutan agar 'from X import *' yang belakangan tetap menang;
+        # sys.path hanya diubah jika ada modul yang belum ada di cache
         for modname in wildcard_modules:
-            print(f"Trying to import {modname}")
-            try:
-                mod = importlib.import_module(modname)
-                print(f"mod {mod}")
-                for sym in dir(mod):
-                    if not sym.startswith("_") and (inspect.isfunction(getattr(mod, sym)) or \
-                        inspect.isclass(getattr(mod, sym))):
-                        self.wildcard_symbols[sym] = f"{modname}.{sym}"
-            except Exception as e:
-                print(f"Failed to import {modname}: {e}")
-                pass
+            symbols = self._wildcard_cache.get(modname)
+            if symbols is None:
+                symbols = self._import_wildcard_symbols(modname)
+                self._wildcard_cache[modname] = symbols
+            self.wildcard_symbols.update(symbols)
         self._return_to_original_path()
+
+    def _import_wildcard_symbols(self, modname):
+        self._change_to_target_path_path()
+        symbols = {}
+        try:
+            mod = importlib.import_module(modname)
+            for sym in dir(mod):
+                # Lewati nama privat/dunder sebelum getattr, lalu ambil objek sekali saja
+                if sym[0] == "_":
+                    continue
+                obj = getattr(mod, sym, None)
+                if inspect.isfunction(obj) or inspect.isclass(obj):
+                    symbols[sym] = f"{modname}.{sym}"
+        except Exception as e:
+            # Hasil gagal juga di-cache agar file lain tidak mencoba ulang
+            logger.warning_print(f"Failed to import wildcard module {modname}: {e}")
+        return symbols
     
     # --- IMPORT PATH RESOLVER START ---
-    def _change_to_target_path_path(self, path):
-        if path not in sys.path:
-            sys.path.insert(0, str(path))
+    def _change_to_target_path_path(self):
+        # sys.path berisi string, jadi bandingkan dengan path yang sudah di-str-kan
+        if self._repo_path_str not in sys.path:
+            sys.path.insert(0, self._repo_path_str)
             self.path_changed = True
     def _return_to_original_path(self):
         if self.path_changed:
-            sys.path.remove(str(self.repo_path))
+            sys.path.remove(self._repo_path_str)
             self.path_changed = False
     # --- IMPORT PATH RESOLVER END ---
 
+    def visit(self, node):
+        # Satu lookup dict per node, menggantikan getattr('visit_' + nama kelas)
+        visitor = self._DISPATCH.get(type(node))
+        if visitor is not None:
+            return visitor(self, node)
+        return self.generic_visit(node)
+
+    def generic_visit(self, node):
+        for child in ast.iter_child_nodes(node):
+            self.visit(child)
+
     def visit_ClassDef(self, node: ast.ClassDef):
         """Process class definitions."""
         old_class = self._current_class
@@ -105,10 +165,10 @@ class DependencyCollector(ast.NodeVisitor):
         
         # Check for base classes dependencies
         for base in node.bases:
-            if isinstance(base, ast.Name):
+            if type(base) is ast.Name:
                 # Simple name reference, could be an imported class
                 self._add_dependency(base.id)
-            elif isinstance(base, ast.Attribute):
+            elif type(base) is ast.Attribute:
                 # Module.Class reference
                 self._process_attribute(base)
         self.generic_visit(node)
@@ -120,10 +180,10 @@ class DependencyCollector(ast.NodeVisitor):
     
     def visit_Call(self, node: ast.Call):
         """Process function calls."""
-        if isinstance(node.func, ast.Name):
+        if type(node.func) is ast.Name:
             # Direct function call
             self._add_dependency(node.func.id)
-        elif isinstance(node.func, ast.Attribute):
+        elif type(node.func) is ast.Attribute:
             # Method call or module.function call
             self._process_attribute(node.func)
         
@@ -139,12 +199,21 @@ class DependencyCollector(ast.NodeVisitor):
         self.generic_visit(node)
 
     def _process_attribute(self, node: ast.Attribute):
+        # Jalur cepat untuk rantai pendek (a.b dan a.b.c) tanpa alokasi list
+        value = node.value
+        if type(value) is ast.Name:
+            self._add_dependency(f"{value.id}.{node.attr}")
+            return
+        if type(value) is ast.Attribute and type(value.value) is ast.Name:
+            self._add_dependency(f"{value.value.id}.{value.attr}.{node.attr}")
+            return
+
         parts = []
         cur = node
-        while isinstance(cur, ast.Attribute):
+        while type(cur) is ast.Attribute:
             parts.append(cur.attr)
             cur = cur.value
-        if isinstance(cur, ast.Name):
+        if type(cur) is ast.Name:
             parts.append(cur.id)
         fullname = ".".join(reversed(parts))
         self._add_dependency(fullname)
@@ -152,53 +221,58 @@ class DependencyCollector(ast.NodeVisitor):
     def _add_dependency(self, name):
         """Add a potential dependency based on a name reference."""
         
-        if name in BUILTIN_TYPES:
-            return
-        if name in EXCLUDED_NAMES:
-            return
-        if name in STANDARD_MODULES:
+        if name in _SKIP_NAMES:
             return
 
         name_parts = name.split('.')
+        name_len = len(name_parts)
         resolved_path = None
         resolved_index = None
 
         # --- RESOLVE PATH START ---
-        for i in range(len(name_parts), 0, -1):
-            # Ambil 'i' bagian pertama dari list
-            current_parts = name_parts[:i]
-            sub_path = ".".join(current_parts)
-            
-            if sub_path in self.imports:
-                resolved_index = i
-                resolved_path = self.imports[sub_path]
-                break
-            elif sub_path in self.wildcard_symbols:
-                resolved_index = i
-                resolved_path = self.wildcard_symbols[sub_path]
-                break
+        if name_len == 1:
+            # Nama tanpa titik (kasus paling umum): cukup lookup langsung
+            resolved_path = self._imports_get(name) or self._wildcard_get(name)
+            if resolved_path:
+                resolved_index = 1
+        else:
+            for i in range(name_len, 0, -1):
+                # Ambil 'i' bagian pertama dari list
+                current_parts = name_parts[:i]
+                sub_path = ".".join(current_parts)
+                
+                resolved_path = self._imports_get(sub_path) or self._wildcard_get(sub_path)
+                if resolved_path:
+                    resolved_index = i
+                    break
 
         parts = []
         if resolved_path:
             resolved_parts = resolved_path.split('.')
-            if len(name.split('.')) > 1:
-                parts = resolved_parts + name.split('.')[(resolved_index):]
+            if name_len > 1:
+                parts = resolved_parts + name_parts[resolved_index:]
             else:
                 parts = resolved_parts # Jika name hanya 'fungsi_x'
         else:
             # Jika tidak ditemukan di `imports` atau `wildcard_symbols`, mungkin ini adalah nama modul tingkat atas atau simbol bawaan.
-            parts = self.current_module.split('.') + name.split('.')
+            parts = self.current_module.split('.') + name_parts
 
-        print(f"\n[*] Found dependency: {name} -> {parts}")
         # --- RESOLVE PATH END ---
         
         if not parts:
             return
-        
-        # --- TRACE TRUE ORIGIN ---
-        self._change_to_target_path_path(self.repo_path)
-        
-        self._return_to_original_path()
 
-        self.dependencies.add(name)
+        if self._known_components is not None and name not in self._known_components \
+                and name.partition('.')[0] not in self._module_prefixes:
+            return
+
+        self._dep_add(name)
 
+    # Tabel dispatch tipe node -> visitor, dibangun sekali per kelas
+    _DISPATCH = {
+        ast.ClassDef: visit_ClassDef,
+        ast.Assign: visit_Assign,
+        ast.Call: visit_Call,
+        ast.Name: visit_Name,
+        ast.Attribute: visit_Attribute,
+    }
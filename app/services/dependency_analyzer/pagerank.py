@@ -1,19 +1,30 @@
 from typing import Dict, Set, Any, List, Tuple
 import numpy as np
 import networkx as nx
+import scipy.sparse as sp
 from app.utils.CustomLogger import CustomLogger
 
 logger = CustomLogger("Pagerank")
 
+def scores_vector_to_dict(nodelist: List[Any], scores: np.ndarray) -> Dict[str, float]:
+    """Mengubah vektor skor NumPy menjadi dictionary {node: score}."""
+    # tolist() mengonversi semua skor ke float Python sekaligus di C
+    return dict(zip(nodelist, scores.tolist()))
+
 def customize_pagerank_processing(
     DG: nx.DiGraph, 
     alpha: float = 0.85, 
     max_iter: int = 100, 
-    tol: float = 1.0e-6
-) -> Tuple[Dict[str, float], int, List[Dict[str, float]]]:
+    tol: float = 1.0e-6,
+    keep_history: bool = False
+) -> Tuple[Dict[str, float], int, List[np.ndarray]]:
     """
     Menghitung PageRank dan mengembalikan skor akhir, jumlah iterasi, 
     dan riwayat skor di setiap iterasi.
+
+    Riwayat hanya disimpan jika keep_history=True, berupa salinan vektor skor
+    per iterasi (urutan indeks sama dengan DG.nodes()). Gunakan
+    scores_vector_to_dict() untuk mengubahnya menjadi {node: score}.
     
     Mengembalikan: (final_scores, total_iterations, history_of_scores)
     """
@@ -22,44 +33,58 @@ def customize_pagerank_processing(
         return {}, 0, []
 
     # 1. Setup Awal
-    # Matriks transisi probabilitas (adjacency matrix yang sudah dinormalisasi)
-    W = nx.google_matrix(DG, alpha=alpha, weight=None)
-    N = W.shape[0]
+    # Matriks adjacency sparse (CSR): memori O(nnz), bukan O(N^2) seperti google_matrix
+    nodelist = list(DG)
+    N = len(nodelist)
+    A = nx.to_scipy_sparse_array(DG, nodelist=nodelist, weight=None, dtype=np.float64, format="csr")
+
+    # Normalisasi baris -> matriks transisi; node tanpa out-edge (dangling) ditangani terpisah
+    out_degree = np.asarray(A.sum(axis=1)).ravel()
+    is_dangling = out_degree == 0
+    out_degree[is_dangling] = 1.0
+    M_T = (sp.diags(1.0 / out_degree) @ A).T.tocsr()
     
     # Vektor PageRank Awal: Distribusi seragam
-    x = np.array([1.0 / N] * N)
+    x = np.full(N, 1.0 / N)
     
     # Simpan riwayat skor
-    history: List[Dict[str, float]] = []
-    
-    # Mapping dari indeks matriks ke nama node
-    node_mapping = dict(zip(range(N), DG.nodes()))
+    history: List[np.ndarray] = []
+
+    # Buffer selisih dipakai ulang di setiap iterasi untuk cek konvergensi
+    diff = np.empty_like(x)
 
     # 2. Loop Iterasi
     for i in range(max_iter):
         xlast = x
         
-        # Hitung skor PageRank iterasi berikutnya
-        # x = alpha * xlast @ W + (1 - alpha) * p
-        x = alpha * xlast @ W + (1 - alpha) * (1.0 / N)
+        # Hitung skor PageRank iterasi berikutnya (sparse matvec)
+        # x = alpha * (xlast @ M + massa_dangling / N) + (1 - alpha) / N
+        # Hanya hasil matvec yang dialokasikan; sisanya dihitung in-place
+        dangling_mass = xlast[is_dangling].sum()
+        x = M_T @ xlast
+        x += dangling_mass / N
+        x *= alpha
+        x += (1 - alpha) / N
         
-        # Konversi skor NumPy ke format dictionary {node: score} untuk riwayat
-        current_scores_dict = {node_mapping[j]: float(x[j]) for j in range(N)}
-        history.append(current_scores_dict)
+        if keep_history:
+            history.append(x.copy())
         
         # 3. Cek Konvergensi
-        err = np.linalg.norm(x - xlast, ord=1) # Menggunakan Norma L1 untuk mengukur perubahan
+        # Norma L1 dari perubahan skor, tanpa array sementara
+        np.subtract(x, xlast, out=diff)
+        np.abs(diff, out=diff)
+        err = float(diff.sum())
         
         if err < tol:
             logger.info_print(f"🎉 **Analisis Selesai:** Konvergensi tercapai pada iterasi ke-{i + 1}.")
             logger.info_print(f"Perubahan Skor (Toleransi): {err:.8f}")
             
             # Mengembalikan hasil akhir (final_scores), total iterasi, dan riwayat
-            return current_scores_dict, i + 1, history
+            return scores_vector_to_dict(nodelist, x), i + 1, history
 
     # Jika loop selesai tanpa konvergensi (mencapai max_iter)
     logger.warning_print(f"⚠️ **Peringatan:** Algoritma mencapai max_iter ({max_iter}) tanpa konvergensi.")
-    return current_scores_dict, max_iter, history
+    return scores_vector_to_dict(nodelist, x), max_iter, history
 
 def get_pagerank_scores(DG: nx.DiGraph) -> Dict[str, float]:
 
@@ -68,11 +93,14 @@ def get_pagerank_scores(DG: nx.DiGraph) -> Dict[str, float]:
         # print("[PageRank] Max Iterasi: ", max_iter)
         # print("[PageRank] History: ", history)
         # print("[PageRank] Result: ", analyze_pagerank_scores)
-        pagerank_scores = nx.pagerank(DG)
+        # NetworkX >= 3 menjalankan nx.pagerank dengan power iteration scipy.sparse
+        # (pagerank_scipy sudah dihapus). Edge tidak berbobot, jadi weight=None
+        # melewati pembacaan atribut bobot per edge.
+        pagerank_scores = nx.pagerank(DG, alpha=0.85, max_iter=100, tol=1.0e-6, weight=None)
         
         return pagerank_scores
-    except Exception as e:
-        # Ini terjadi jika ada siklus dependensi (misal: A -> B -> A)
-        print(f"[PageRank] Error: {e}")
-        # Anda bisa menangani ini dengan cara lain, misal mengembalikan list kosong
-        return []
\ No newline at end of file
+    except nx.PowerIterationFailedConvergence as e:
+        # Power iteration tidak konvergen dalam max_iter
+        logger.warning_print(f"PageRank tidak konvergen: {e}")
+        # Kembalikan dict kosong agar tipe tetap konsisten untuk pemanggil
+        return {}
\ No newline at end of file
@@ -1,23 +1,73 @@
-from typing import Dict, List, Set, Tuple, Optional, Any, Union
+from typing import Dict, List, Set, Tuple, Optional, Any, Union, Iterator
 import os
+import sys
+import gc
 import ast
+import threading
 import json
+import orjson
 import logging
 from enum import Enum
 from pathlib import Path
+from collections import deque
+from contextlib import contextmanager
+from itertools import islice
+from concurrent.futures import ThreadPoolExecutor, Future
 import networkx as nx
 from dataclasses import dataclass, field
 
 from app.services.dependency_analyzer.resolver import DependencyResolver, PrimaryDependencyResolver, AlternativeDependencyResolver
 from app.schemas.models.code_component_schema import CodeComponent, ResolverStrategy
-from app.utils.dependency_analyzer_utils import file_to_module_path, add_parent_to_nodes
+from app.utils.dependency_analyzer_utils import file_to_module_path
 from app.services.dependency_analyzer.collector import DependencyCollector, ImportCollector
+from pymongo import ReplaceOne
 from app.core.mongo_client import get_db
+from app.services.documentation_service import get_components_collection_name
 from app.utils.CustomLogger import CustomLogger
 from app.services.code_component_service import get_hydrated_components_for_record, map_components_by_id
 
 logger = CustomLogger("DepParser")
 
+# Node yang bisa berisi definisi (fungsi/kelas) di dalam body-nya
+_BLOCK_NODE_TYPES = (ast.stmt, ast.excepthandler, ast.match_case)
+
+# Nama direktori (lowercase) yang tidak ditelusuri saat mencari file relevan
+_EXCLUDED_DIR_NAMES = frozenset({"venv", ".venv", "pycg-venv", "__pycache__", "tests", "test", "__macosx", "scripts", "docs", "experiments"})
+# Pola nama file test yang dikecualikan
+_TEST_FILE_PREFIX = "test_"
+_TEST_FILE_SUFFIX = "_test.py"
+
+# Prefetch isi file pada first pass: jumlah thread I/O dan file yang dibaca di depan
+_PREFETCH_WORKERS = 8
+_PREFETCH_WINDOW = 32
+
+# Threshold generasi 0 GC selama first pass. GC tidak dimatikan (parsing berjalan
+# di dalam server API), hanya dijarangkan; dihitung per pass yang sedang berjalan
+# agar pass yang selesai lebih dulu tidak mengembalikan threshold terlalu cepat
+_PARSE_GC_GEN0_THRESHOLD = 50_000
+_gc_relax_lock = threading.Lock()
+_gc_relax_depth = 0
+_gc_saved_threshold: Optional[Tuple[int, ...]] = None
+
+
+@contextmanager
+def _relaxed_gc():
+    """Menaikkan threshold gen0 GC selama blok berjalan (reference-counted, thread-safe)."""
+    global _gc_relax_depth, _gc_saved_threshold
+    with _gc_relax_lock:
+        if _gc_relax_depth == 0:
+            _gc_saved_threshold = gc.get_threshold()
+            gc.set_threshold(max(_PARSE_GC_GEN0_THRESHOLD, _gc_saved_threshold[0]), *_gc_saved_threshold[1:])
+        _gc_relax_depth += 1
+    try:
+        yield
+    finally:
+        with _gc_relax_lock:
+            _gc_relax_depth -= 1
+            if _gc_relax_depth == 0:
+                gc.set_threshold(*_gc_saved_threshold)
+                _gc_saved_threshold = None
+
 class DependencyParser:
     def __init__(self, repo_path: Path, project_root_folder: Path, task_id: str, root_module_name: str, resolver_strategy: ResolverStrategy = ResolverStrategy.FIRST):
         self.repo_path = repo_path
@@ -27,6 +77,8 @@ class DependencyParser:
         self.class_components: Dict[str, CodeComponent] = {}
         self.dependency_graph: Dict[str, List[str]] = {}
         self.modules: Set[str] = set()
+        # AST per file (absolute path) dari first pass, dipakai ulang oleh resolver
+        self.parsed_trees: Dict[str, ast.Module] = {}
 
         self.task_id = task_id
         self.root_module_name = root_module_name
@@ -34,7 +86,7 @@ class DependencyParser:
 
     def _get_resolver(self, strategy: ResolverStrategy) -> DependencyResolver:
         """Factory method to select the dependency resolution strategy."""
-        resolver_args = (self.components, self.modules, self.repo_path, self.task_id, self.root_module_name, self.project_root_folder)
+        resolver_args = (self.components, self.modules, self.repo_path, self.task_id, self.root_module_name, self.project_root_folder, self.parsed_trees)
         if strategy == ResolverStrategy.FIRST:
             return PrimaryDependencyResolver(*resolver_args)
         elif strategy == ResolverStrategy.SECOND:
@@ -56,194 +108,283 @@ class DependencyParser:
         print(f"Repo path (parsing): {self.repo_path}")
 
         # FIRST PASS: Collect all components
-        for file_path in self.relevant_files:
-            relative_path = file_path.relative_to(self.repo_path)
-            module_path = file_to_module_path(str(relative_path))
-            self.modules.add(module_path)
+        # Semua file relevan berada di bawah repo_path, jadi path relatif cukup
+        # diambil dengan slice string (relative_to hanya untuk path yang tidak
+        # diawali prefix ini, misal repo_path relatif)
+        repo_prefix = os.path.join(str(self.repo_path), "")
+        repo_prefix_len = len(repo_prefix)
+
+        # GC gen0 dijarangkan selama parsing: ast.parse membuat banyak objek yang
+        # tetap hidup, sehingga koleksi berulang di sini hanya membuang waktu
+        with _relaxed_gc():
+            for file_path, raw_source_future in self._prefetch_file_bytes(self.relevant_files):
+                file_path_str = str(file_path)
+                if file_path_str.startswith(repo_prefix):
+                    relative_path = file_path_str[repo_prefix_len:]
+                else:
+                    relative_path = str(file_path.relative_to(self.repo_path))
+                module_path = file_to_module_path(relative_path)
+                self.modules.add(module_path)
 
-            # Parse the file to collect components
-            self._parse_file(str(file_path), str(relative_path), module_path)
+                # Parse the file to collect components
+                self._parse_file(file_path_str, relative_path, module_path, raw_source_future.result())
 
         # SECOND PASS: build dependencies
         self.resolver.resolve(self.relevant_files)
 
-        # THIRD PASS: class and method dependencies
-        self._add_class_method_dependencies()
-        # FOURTH PASS: parent class dependencies
+        # THIRD PASS: parent class dependencies
+        # (dependensi class -> method sudah dicatat di _collect_components)
         self._add_parent_class_dependencies()
-        # FIFTH PASS: decorators dependencies
+        # FOURTH PASS: decorators dependencies
         self._add_decorator_dependencies()
 
+        # AST per file hanya dibutuhkan selama pass di atas. Dikosongkan in-place
+        # (dict ini dipakai bersama resolver) agar Module dan statement non-komponen
+        # bisa dibebaskan; komponen tetap memegang node miliknya sendiri.
+        self.parsed_trees.clear()
+
         # logger.info_print(f"Total components collected: {len(self.components)}")
         return self.components
 
     def get_relevant_files(self):
         logger.info_print(f"Parsing repository at {self.repo_path}")
 
-        all_py_files = self.repo_path.rglob('*.py')
-        current_relevant_files = []
-
-        exclude_dirs = {"venv", ".venv", "pycg-venv", "__pycache__", "tests", "test", "__MACOSX", "__macosx", "scripts", "docs", "experiments"}
-
-        for file_path in all_py_files:
-            path_parts = {part.lower() for part in file_path.parts}
-        
-            # Kondisi untuk mengecualikan file
-            is_test_file = file_path.name.startswith("test_") or file_path.name.endswith("_test.py")
-            is_excluded_dir = any(part in exclude_dirs for part in path_parts)
-
-            # Jika tidak ada kondisi pengecualian yang terpenuhi, tambahkan file ke list
-            if not (is_test_file or is_excluded_dir):
-                current_relevant_files.append(file_path)
-                # logging.info(f"{file_path}")
+        # Walk manual dengan os.scandir: direktori yang dikecualikan dipangkas
+        # sebelum dimasuki (rglob menelusuri semuanya lalu menyaring di akhir).
+        # Urutan hasil sama dengan rglob di Python 3.11: DFS pre-order, file milik
+        # sebuah direktori dulu, lalu tiap subdirektori secara rekursif (urutan scandir).
+        current_relevant_files: List[Path] = []
+        stack = [str(self.repo_path)]
+        while stack:
+            dir_files, sub_dirs = self._scan_directory(stack.pop())
+            current_relevant_files.extend(dir_files)
+            stack.extend(reversed(sub_dirs))
 
         logger.info_print(f"Total relevant Python files to parse: {len(current_relevant_files)}")
         self.relevant_files = current_relevant_files
 
         return current_relevant_files
+
+    def _scan_directory(self, dir_path: str) -> Tuple[List[Path], List[str]]:
+        """
+        Memindai satu direktori. Mengembalikan (file .py yang relevan, subdirektori
+        yang tidak dikecualikan). Pengecualian hanya diterapkan pada bagian path
+        di dalam repo; symlink direktori tidak diikuti.
+        """
+        relevant_files: List[Path] = []
+        sub_dirs: List[str] = []
+        try:
+            with os.scandir(dir_path) as it:
+                for entry in it:
+                    name = entry.name
+                    if entry.is_dir(follow_symlinks=False):
+                        if name.lower() not in _EXCLUDED_DIR_NAMES:
+                            sub_dirs.append(entry.path)
+                    elif name.endswith(".py") and entry.is_file():
+                        # Kondisi untuk mengecualikan file
+                        is_test_file = name.startswith(_TEST_FILE_PREFIX) or name.endswith(_TEST_FILE_SUFFIX)
+                        if not is_test_file:
+                            relevant_files.append(Path(entry.path))
+        except OSError as e:
+            logger.warning_print(f"Cannot scan directory {dir_path}: {e}")
+
+        return relevant_files, sub_dirs
     
     # --- 1 PARSING FILES START ---
-    def _parse_file(self, file_path: str, relative_path: str, module_path: str):
+    def _prefetch_file_bytes(self, files: List[Path]) -> Iterator[Tuple[Path, Future]]:
+        """
+        Membaca isi file di thread pool, berjalan mendahului parsing di thread utama
+        sehingga I/O disk tumpang tindih dengan ast.parse. Paling banyak
+        _PREFETCH_WINDOW file dibaca di depan agar memori tetap terbatas.
+        Menghasilkan (file_path, future bytes) sesuai urutan files.
+        """
+        file_iter = iter(files)
+        with ThreadPoolExecutor(max_workers=_PREFETCH_WORKERS) as io_executor:
+            pending = deque(
+                (file_path, io_executor.submit(file_path.read_bytes))
+                for file_path in islice(file_iter, _PREFETCH_WINDOW)
+            )
+            while pending:
+                next_file_path = next(file_iter, None)
+                if next_file_path is not None:
+                    pending.append((next_file_path, io_executor.submit(next_file_path.read_bytes)))
+                yield pending.popleft()
+
+    def _parse_file(self, file_path: str, relative_path: str, module_path: str, raw_source: Optional[bytes] = None):
         """Parse a single Python file to collect code components."""
+        # ID komponen dan depends_on berbagi prefix module_path; intern agar
+        # string yang sama dipakai bersama dan lookup dict cukup cek pointer
+        module_path = sys.intern(module_path)
         try:
-            with open(file_path, "r", encoding="utf-8") as f:
-                source = f.read()
-            tree = ast.parse(source)
+            if raw_source is None:
+                raw_source = Path(file_path).read_bytes()
+
+            # File tanpa kata "def"/"class" sama sekali (misal __init__.py yang hanya
+            # re-export) tidak mungkin punya komponen: lewati parse. Jika resolver
+            # nanti butuh AST-nya, file di-parse lazy lewat _get_parsed_tree.
+            if b"def" not in raw_source and b"class" not in raw_source:
+                return
+
+            # Decode sekali (strict UTF-8, seperti sebelumnya) untuk potongan source,
+            # tapi parse langsung dari bytes agar tokenizer tidak encode ulang teks
+            source = raw_source.decode("utf-8")
+            tree = ast.parse(raw_source, filename=file_path, type_comments=False)
+            self.parsed_trees[os.path.abspath(file_path)] = tree
+
+            # Split baris source sekali per file, dipakai semua komponen di file ini
+            source_lines = source.splitlines()
 
-            # Add parent field to AST nodes for easier traversal
-            add_parent_to_nodes(tree)
-            
             # Collect Project Components
-            self._collect_components(tree, file_path, relative_path, module_path, source)
+            self._collect_components(tree, file_path, relative_path, module_path, source, source_lines)
 
         except (SyntaxError, UnicodeDecodeError) as e:
             logger.warning_print(f"Error parsing {file_path}: {e}")
 
     def _collect_components(self, tree: ast.AST, file_path: str, relative_path: str, 
-                          module_path: str, source: str):
-        """Collect all code components (functions, classes, methods) from an AST."""
-        for node in ast.walk(tree):
-            if isinstance(node, ast.ClassDef):
-                # Class definition
-                class_id = f"{module_path}.{node.name}"
-                
-                # Check if the class has a docstring
-                has_docstring = (
-                    len(node.body) > 0 
-                    and isinstance(node.body[0], ast.Expr) 
-                    and isinstance(node.body[0].value, ast.Constant)
-                    and isinstance(node.body[0].value.value, str)
-                )
+                          module_path: str, source: str, source_lines: List[str]):
+        """
+        Collect all code components (functions, classes, methods) from an AST.
+
+        Traversal BFS hanya melewati node blok (statement, handler except, case
+        match) karena definisi tidak pernah berada di dalam ekspresi, sehingga
+        urutannya tetap sama dengan ast.walk. Handler dipilih lewat tabel
+        dispatch berdasarkan tipe node; flag is_top_level menandai anak langsung
+        dari Module.
+        """
+        # Prefix ID dibangun sekali per file, bukan per komponen
+        module_prefix = f"{module_path}."
+
+        queue = deque((child, True) for child in ast.iter_child_nodes(tree))
+        while queue:
+            node, is_top_level = queue.popleft()
+
+            handler = self._COMPONENT_HANDLERS.get(type(node))
+            if handler is not None:
+                handler(self, node, is_top_level, file_path, relative_path, module_prefix, source, source_lines)
+
+            queue.extend(
+                (child, False) for child in ast.iter_child_nodes(node)
+                if isinstance(child, _BLOCK_NODE_TYPES)
+            )
+
+    def _collect_class(self, node: ast.ClassDef, is_top_level: bool, file_path: str, relative_path: str,
+                       module_prefix: str, source: str, source_lines: List[str]):
+        """Collect a class component and its methods."""
+        # Class definition
+        class_id = sys.intern(module_prefix + node.name)
+        
+        # Docstring mentah (tanpa clean), None jika tidak ada
+        raw_docstring = ast.get_docstring(node, clean=False)
+        has_docstring = raw_docstring is not None
+        docstring = raw_docstring or ""
+        
+        start_line = node.decorator_list[0].lineno if node.decorator_list else node.lineno
+        end_line = getattr(node, "end_lineno", node.lineno)
+        
+        component = CodeComponent(
+            id=class_id,
+            node=node,
+            component_type="class",
+            file_path=file_path,
+            relative_path=relative_path,
+            source_code=self._get_source_segment(source_lines, start_line, end_line),
+            component_signature=self._get_source_signature(node),
+            start_line=start_line,
+            end_line=end_line,
+            has_docstring=has_docstring,
+            docstring=docstring
+        )
+        
+        self.components[class_id] = component
+        self.class_components[class_id] = component
+        
+        class_header_end_line = end_line
+        class_prefix = f"{class_id}."
+        # Collect methods within the class
+        for item in node.body:
+            if isinstance(item, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                method_id = sys.intern(class_prefix + item.name)
                 
-                # Extract docstring if it exists
-                docstring = self._get_docstring(source, node) if has_docstring else ""
+                # Docstring mentah (tanpa clean), None jika tidak ada
+                method_raw_docstring = ast.get_docstring(item, clean=False)
+                method_has_docstring = method_raw_docstring is not None
+                method_docstring = method_raw_docstring or ""
                 
-                start_line = node.decorator_list[0].lineno if node.decorator_list else node.lineno
-                end_line = getattr(node, "end_lineno", node.lineno)
+                method_start_line = item.decorator_list[0].lineno if item.decorator_list else item.lineno
+                method_end_line = getattr(item, "end_lineno", item.lineno)
                 
-                component = CodeComponent(
-                    id=class_id,
-                    node=node,
-                    component_type="class",
+                method_component = CodeComponent(
+                    id=method_id,
+                    node=item,
+                    component_type="method",
                     file_path=file_path,
                     relative_path=relative_path,
-                    source_code=self._get_source_segment(source, start_line, end_line),
-                    component_signature=self._get_source_signature(node),
-                    start_line=start_line,
-                    end_line=end_line,
-                    has_docstring=has_docstring,
-                    docstring=docstring
+                    source_code=self._get_source_segment(source_lines, method_start_line, method_end_line),
+                    component_signature=self._get_source_signature(item),
+                    start_line=method_start_line,
+                    end_line=method_end_line,
+                    header_end_line=method_end_line,
+                    has_docstring=method_has_docstring,
+                    docstring=method_docstring
                 )
                 
-                self.components[class_id] = component
-                self.class_components[class_id] = component
-                
-                class_header_end_line = end_line
-                # Collect methods within the class
-                for item in node.body:
-                    if isinstance(item, (ast.FunctionDef, ast.AsyncFunctionDef)):
-                        method_id = f"{class_id}.{item.name}"
-                        
-                        # Check if the method has a docstring
-                        method_has_docstring = (
-                            len(item.body) > 0 
-                            and isinstance(item.body[0], ast.Expr) 
-                            and isinstance(item.body[0].value, ast.Constant)
-                            and isinstance(item.body[0].value.value, str)
-                        )
-                        
-                        # Extract docstring if it exists
-                        method_docstring = self._get_docstring(source, item) if method_has_docstring else ""
-                        
-                        method_start_line = item.decorator_list[0].lineno if item.decorator_list else item.lineno
-                        method_end_line = getattr(item, "end_lineno", item.lineno)
-                        
-                        method_component = CodeComponent(
-                            id=method_id,
-                            node=item,
-                            component_type="method",
-                            file_path=file_path,
-                            relative_path=relative_path,
-                            source_code=self._get_source_segment(source, method_start_line, method_end_line),
-                            component_signature=self._get_source_signature(item),
-                            start_line=method_start_line,
-                            end_line=method_end_line,
-                            header_end_line=method_end_line,
-                            has_docstring=method_has_docstring,
-                            docstring=method_docstring
-                        )
-                        
-                        # set header end line of class if method ends later
-                        if method_start_line > class_header_end_line:
-                            class_header_end_line = method_start_line
-                            
-                        self.components[method_id] = method_component
-
-                # set class header end line if __init__ not found
-                self.components[class_id].header_end_line = class_header_end_line
-                
-            elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
-                # Only collect top-level functions
-                if hasattr(node, 'parent') and isinstance(node.parent, ast.Module):
-                    func_id = f"{module_path}.{node.name}"
-                    
-                    # Check if the function has a docstring
-                    has_docstring = (
-                        len(node.body) > 0 
-                        and isinstance(node.body[0], ast.Expr) 
-                        and isinstance(node.body[0].value, ast.Constant)
-                        and isinstance(node.body[0].value.value, str)
-                    )
-                    
-                    # Extract docstring if it exists
-                    docstring = self._get_docstring(source, node) if has_docstring else ""
-                    
-                    function_start_line = node.decorator_list[0].lineno if node.decorator_list else node.lineno
-                    function_end_line = getattr(node, "end_lineno", node.lineno)
-                    
-                    component = CodeComponent(
-                        id=func_id,
-                        node=node,
-                        component_type="function",
-                        file_path=file_path,
-                        relative_path=relative_path,
-                        source_code=self._get_source_segment(source, function_start_line, function_end_line),
-                        component_signature=self._get_source_signature(node),
-                        start_line=function_start_line,
-                        end_line=function_end_line,
-                        header_end_line=function_end_line,
-                        has_docstring=has_docstring,
-                        docstring=docstring
-                    )
+                # set header end line of class if method ends later
+                if method_start_line > class_header_end_line:
+                    class_header_end_line = method_start_line
                     
-                    self.components[func_id] = component
+                self.components[method_id] = method_component
 
-    def _get_source_segment(self, source: str, start_line: int, end_line: int) -> str:
-        """Get source code segment for an AST node."""
+                # Class bergantung pada method-methodnya (kecuali __init__)
+                if item.name != "__init__":
+                    component.depends_on.add(method_id)
+
+        # set class header end line if __init__ not found
+        self.components[class_id].header_end_line = class_header_end_line
+
+    def _collect_function(self, node: Union[ast.FunctionDef, ast.AsyncFunctionDef], is_top_level: bool, file_path: str,
+                          relative_path: str, module_prefix: str, source: str, source_lines: List[str]):
+        """Collect a function component; only top-level functions are collected."""
+        if not is_top_level:
+            return
+
+        func_id = sys.intern(module_prefix + node.name)
+        
+        # Docstring mentah (tanpa clean), None jika tidak ada
+        raw_docstring = ast.get_docstring(node, clean=False)
+        has_docstring = raw_docstring is not None
+        docstring = raw_docstring or ""
+        
+        function_start_line = node.decorator_list[0].lineno if node.decorator_list else node.lineno
+        function_end_line = getattr(node, "end_lineno", node.lineno)
+        
+        component = CodeComponent(
+            id=func_id,
+            node=node,
+            component_type="function",
+            file_path=file_path,
+            relative_path=relative_path,
+            source_code=self._get_source_segment(source_lines, function_start_line, function_end_line),
+            component_signature=self._get_source_signature(node),
+            start_line=function_start_line,
+            end_line=function_end_line,
+            header_end_line=function_end_line,
+            has_docstring=has_docstring,
+            docstring=docstring
+        )
+        
+        self.components[func_id] = component
+
+    # Tabel dispatch tipe node -> handler pengumpul komponen
+    _COMPONENT_HANDLERS = {
+        ast.ClassDef: _collect_class,
+        ast.FunctionDef: _collect_function,
+        ast.AsyncFunctionDef: _collect_function,
+    }
+
+    def _get_source_segment(self, source_lines: List[str], start_line: int, end_line: int) -> str:
+        """Get source code segment for an AST node from the pre-split file lines."""
         try:
-            # Fallback to manual extraction
-            lines = source.splitlines()
-            segment_lines = lines[start_line - 1:end_line]
+            segment_lines = source_lines[start_line - 1:end_line]
             return "\n".join(segment_lines)
         
         except Exception as e:
@@ -327,76 +468,21 @@ class DependencyParser:
         # Jika node bukan tipe yang didukung, kembalikan string kosong
         return ""
     
-    def _get_docstring(self, source: str, node: ast.AST) -> str:
-        """Get the docstring for a given AST node."""
-        try:
-            if isinstance(node, ast.FunctionDef) or isinstance(node, ast.AsyncFunctionDef):
-                for item in node.body:
-                    if isinstance(item, ast.Expr) and isinstance(item.value, ast.Constant):
-                        if isinstance(item.value.value, str):
-                            return item.value.value
-            elif isinstance(node, ast.ClassDef):
-                for item in node.body:
-                    if isinstance(item, ast.Expr) and isinstance(item.value, ast.Constant):
-                        if isinstance(item.value.value, str):
-                            return item.value.value
-            return ""
-        except Exception as e:
-            logger.warning_print(f"Error getting docstring: {e}")
-            return 
-    
-    def build_dependency_graph_from_components(self) -> Dict[str, Set[str]]:
-        graph = {}
-
-        for comp_id, component in self.components.items():
-            # Initialize the node's adjacency list
-            if comp_id not in graph:
-                graph[comp_id] = set()
-            
-            # Add dependencies
-            for dep_id in component.depends_on:
-                # Only include dependencies that are actual components in our repository
-                if dep_id in self.components:
-                    graph[comp_id].add(dep_id)
-                    self.components[dep_id].used_by.add(comp_id)
-        
-        for component_id, deps in graph.items():
-            self.dependency_graph[component_id] = list(deps)
+    def build_dependency_graph_from_components(self) -> Dict[str, List[str]]:
+        components = self.components
+        dependency_graph = self.dependency_graph
+
+        # Satu pass: adjacency list ditulis langsung ke self.dependency_graph
+        for comp_id, component in components.items():
+            # Only include dependencies that are actual components in our repository
+            deps = {dep_id for dep_id in component.depends_on if dep_id in components}
+            for dep_id in deps:
+                components[dep_id].used_by.add(comp_id)
+            dependency_graph[comp_id] = list(deps)
         
-        return self.dependency_graph
+        return dependency_graph
     # --- 1 PARSING FILES END ---
 
-    # --- 2 ADD CLASS METHOD DEPENDENCIES START ---
-    def _add_class_method_dependencies(self):
-        """
-        Third pass to make classes dependent on their methods (except __init__).
-        """
-        # Group components by class
-        class_methods = {}
-        
-        # Collect all methods for each class
-        for component_id, component in self.components.items():
-            if component.component_type == "method":
-                parts = component_id.split(".")
-                if len(parts) >= 2:
-                    method_name = parts[-1]
-                    class_id = ".".join(parts[:-1])
-                    
-                    if class_id not in class_methods:
-                        class_methods[class_id] = []
-                    
-                    # Don't include __init__ methods as dependencies of the class
-                    if method_name != "__init__":
-                        class_methods[class_id].append(component_id)
-        
-        # Add method dependencies to their classes
-        for class_id, method_ids in class_methods.items():
-            if class_id in self.components:
-                class_component = self.components[class_id]
-                for method_id in method_ids:
-                    class_component.depends_on.add(method_id)
-    # --- 2 ADD CLASS METHOD DEPENDENCIES END ---
-
     # --- 2B ADD PARENT CLASS DEPENDENCIES
     def _add_parent_class_dependencies(self):
                     
@@ -518,17 +604,18 @@ class DependencyParser:
     # --- 4 Save Data dependency START ---
     def save_components(self, output_path: str):
         """Save the dependency graph to a JSON file."""
-        # Convert to serializable format
-        serializable_components = {
-            comp_id: component.to_dict()
-            for comp_id, component in self.components.items()
-        }
-        
         # Create directories if they don't exist
         os.makedirs(os.path.dirname(output_path), exist_ok=True)
-        
-        with open(output_path, "w", encoding="utf-8") as f:
-            json.dump(serializable_components, f, indent=2)
+
+        # Ditulis bertahap per komponen (tanpa dict perantara untuk seluruh repo)
+        # dalam JSON ringkas: file ini hanya dibaca ulang oleh program, bukan manusia
+        with open(output_path, "wb") as f:
+            f.write(b"{")
+            separator = b""
+            for comp_id, component in self.components.items():
+                f.write(separator + orjson.dumps(comp_id) + b":" + orjson.dumps(component.to_dict()))
+                separator = b","
+            f.write(b"}")
     
     def add_component_dependency_graph_urls(self, component_ids: List[str], record_code: str):
         for component_id in component_ids:
@@ -536,8 +623,11 @@ class DependencyParser:
                 component_id_with_underscore = component_id.replace('.', '_')
                 self.components[component_id].dependency_graph_url = f"{record_code}/{component_id_with_underscore}.png"
     
-    def save_record_to_database(self, record_code: str, metadata = {}, collection: str = "documentation_results", name: Optional[str] = None):
-        
+    def save_record_to_database(self, record_code: str, metadata = {}, collection: str = "documentation_results", name: Optional[str] = None) -> bool:
+        """
+        Menyimpan seluruh record: semua komponen (satu dokumen per komponen) lalu
+        dokumen induk. Mengembalikan True jika berhasil.
+        """
         # 1. Penyusunan documents_to_insert (List of Dictionaries)
         documents_to_insert: List[Dict[str, Any]] = []
         
@@ -557,27 +647,49 @@ class DependencyParser:
         if not documents_to_insert:
             # Pengecekan kedua setelah pemrosesan
             print(f"[DB] Operasi dibatalkan: Tidak ada dokumen komponen yang valid untuk disimpan.")
-            return
+            return False
 
         # 2. Penyusunan Dokumen Induk (Record Document)
+        # Komponen disimpan per dokumen di koleksi komponen (bukan array di dalam
+        # dokumen induk) agar record besar tidak menabrak batas 16MB BSON
         record_document = {
             "_id": record_code, # Menggunakan record_code sebagai ID unik
             "name": name if name is not None else record_code,
-            "components": documents_to_insert,
+            "component_count": len(documents_to_insert),
             "meta_information": metadata
         }
         
-        # 3. Operasi Database (replace_one dengan upsert)
+        # 3. Operasi Database
         try:
             db = get_db()
+            components_collection = db[get_components_collection_name(collection)]
             collection = db[collection]
 
+            # 3.1 Upsert semua komponen dengan _id deterministik per record
+            component_doc_ids = [self._component_doc_id(record_code, component_order) for component_order in range(len(documents_to_insert))]
+            components_collection.bulk_write(
+                [
+                    ReplaceOne(
+                        {"_id": component_doc_id},
+                        {**doc_dict, "record_code": record_code, "component_order": component_order},
+                        upsert=True
+                    )
+                    for component_order, (component_doc_id, doc_dict) in enumerate(zip(component_doc_ids, documents_to_insert))
+                ],
+                ordered=False
+            )
+
+            # 3.2 Dokumen induk baru ditulis setelah semua komponen berhasil
             result = collection.replace_one(
                 {"_id": record_code},
                 record_document,
                 upsert=True
             )
-            
+
+            # 3.3 Sisa komponen lama dihapus paling akhir; pembaca sudah dibatasi
+            # component_count baru sehingga sisa ini tidak terbaca di antara langkah
+            components_collection.delete_many({"record_code": record_code, "_id": {"$nin": component_doc_ids}})
+
             # Laporan Hasil
             if result.upserted_id:
                 print(f"[DB SUCCESS] Record '{record_code}' - Name '{name}' berhasil DIBUAT (Insert). Jumlah komponen: {len(documents_to_insert)}.")
@@ -585,30 +697,34 @@ class DependencyParser:
                 print(f"[DB SUCCESS] Record '{record_code}' berhasil DIPERBARUI (Update). Jumlah komponen: {len(documents_to_insert)}.")
             else:
                 print(f"[DB INFO] Record '{record_code}' sudah ada dan tidak ada perubahan data.")
+            return True
 
         except Exception as e:
+            # Jika upsert komponen gagal, dokumen induk dan komponen lama tidak disentuh
             print(f"[DB ERROR] Gagal menyimpan atau memperbarui record '{record_code}': {e}")
+            return False
+
+    @staticmethod
+    def _component_doc_id(record_code: str, component_order: int) -> str:
+        """_id dokumen komponen: deterministik per (record, urutan komponen)."""
+        return f"{record_code}:{component_order}"
     # --- 4 Save Data dependency END ---
         
     # --- 5 DiGraph Processing START ---
     def get_Nx_DiGraph(self) -> nx.DiGraph:
-        edges = []
-        all_nodes = set(self.dependency_graph.keys())
-
-        for source_node, target_nodes in self.dependency_graph.items():
-            if not target_nodes:
-                continue
-            for target_node in target_nodes:
-                # Di networkx, edge (A, B) berarti A -> B (A menunjuk ke B).
-                # Dalam konteks dependensi, "A bergantung pada B" berarti kita perlu
-                # memproses B SEBELUM A. Jadi, edge harus dari B ke A (B -> A).
-                edges.append((target_node, source_node))
-                all_nodes.add(target_node)
-
         # Buat grafik berarah (DiGraph)
         DG = nx.DiGraph()
-        DG.add_nodes_from(all_nodes) # Tambahkan semua node, termasuk yang terisolasi
-        DG.add_edges_from(edges)
+        DG.add_nodes_from(self.dependency_graph) # Tambahkan semua node, termasuk yang terisolasi
+
+        # Di networkx, edge (A, B) berarti A -> B (A menunjuk ke B).
+        # Dalam konteks dependensi, "A bergantung pada B" berarti kita perlu
+        # memproses B SEBELUM A. Jadi, edge harus dari B ke A (B -> A).
+        # Edge dialirkan lewat generator; node target yang belum ada ditambahkan otomatis.
+        DG.add_edges_from(
+            (target_node, source_node)
+            for source_node, target_nodes in self.dependency_graph.items()
+            for target_node in target_nodes
+        )
         
         return DG
         
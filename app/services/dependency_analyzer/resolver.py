@@ -8,11 +8,13 @@ import logging
 import subprocess
 import json
 import os
+import sys
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 
 from .collector import ImportCollector, DependencyCollector
 from app.schemas.models.code_component_schema import CodeComponent, ResolverStrategy
-from app.utils.dependency_analyzer_utils import file_to_module_path, add_parent_to_nodes
+from app.utils.dependency_analyzer_utils import file_to_module_path
 from app.core.config import settings
 from app.core.config import PYCG_OUTPUT_DIR
 from app.utils.CustomLogger import CustomLogger
@@ -24,13 +26,15 @@ class DependencyResolver(ABC):
     Abstract base class for dependency resolution strategies.
     Defines the contract for all concrete resolver implementations.
     """
-    def __init__(self, components: Dict[str, CodeComponent], modules: Set[str], repo_path: Path, task_id: str, root_module_name: str, project_root_folder: Path):
+    def __init__(self, components: Dict[str, CodeComponent], modules: Set[str], repo_path: Path, task_id: str, root_module_name: str, project_root_folder: Path, parsed_trees: Optional[Dict[str, ast.Module]] = None):
         self.components = components
         self.modules = modules
         self.repo_path = repo_path
         self.task_id = task_id
         self.root_module_name = root_module_name
         self.project_root_folder = project_root_folder
+        # Cache AST per file (absolute path), dibagi dengan DependencyParser
+        self.parsed_trees: Dict[str, ast.Module] = parsed_trees if parsed_trees is not None else {}
 
     @abstractmethod
     def resolve(self, relevant_files: List[Path]) -> None:
@@ -41,6 +45,19 @@ class DependencyResolver(ABC):
         """
         pass
     
+    def _get_parsed_tree(self, file_path: str) -> ast.Module:
+        """
+        Mengambil AST sebuah file dari cache in-process (dibagi dengan first pass
+        parser), parse hanya jika belum ada.
+        Exception parse (SyntaxError, OSError, dll.) diteruskan ke pemanggil.
+        """
+        abs_path = os.path.abspath(file_path)
+        tree = self.parsed_trees.get(abs_path)
+        if tree is None:
+            tree = ast.parse(Path(abs_path).read_bytes(), filename=abs_path)
+            self.parsed_trees[abs_path] = tree
+        return tree
+
     def _get_node_name_str(self, node: ast.AST) -> Optional[str]:
         """
         Helper untuk mengubah node AST (seperti BaseAgent atau parents.BaseAgent)
@@ -207,9 +224,7 @@ class DependencyResolver(ABC):
             return None
 
         try:
-            with open(current_filepath, "r", encoding="utf-8") as f:
-                source = f.read()
-            mod_tree = ast.parse(source, filename=current_filepath)
+            mod_tree = self._get_parsed_tree(current_filepath)
         except Exception as e:
             return None
 
@@ -482,55 +497,66 @@ class PrimaryDependencyResolver(DependencyResolver):
     """
     def _filter_safe_files(self, all_files: List[Path]) -> List[Path]:
         """
-        Menjalankan pycg pada setiap file satu per satu dengan timeout 30 detik
+        Menjalankan pycg pada setiap file satu per satu dengan timeout 20 detik
         untuk menyaring file yang menyebabkan hang atau crash.
+
+        Setiap pengecekan adalah subprocess terpisah, jadi dijalankan paralel
+        dengan thread pool kecil (settings.PYCG_SAFETY_CHECK_WORKERS) agar tidak
+        membanjiri mesin dengan proses pycg; urutan hasil tetap mengikuti urutan all_files.
         """
         
-        safe_files: List[Path] = []
-        bad_files: List[Path] = []
-        
         # Siapkan environment sekali saja
         clean_env = os.environ.copy()
         clean_env.pop("PYTHONPATH", None)
 
-        for file_path in all_files:
-            file_name = os.path.basename(file_path)
+        max_workers = max(1, min(len(all_files), settings.PYCG_SAFETY_CHECK_WORKERS))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            results = list(executor.map(
+                lambda file_path: self._is_pycg_safe_file(file_path, clean_env),
+                all_files
+            ))
 
-            # Perintah untuk mengecek SATU file
-            # Kita tidak butuh output-nya, jadi kita tidak pakai '--output'
-            check_command = [
-                settings.PYCG_PYTHON_EXECUTABLE,
-                "-m", "pycg",
-                str(file_path),  # <-- Hanya SATU file
-                "--package", str(self.repo_path)
-            ]
-            
-            try:
-                subprocess.run(
-                    check_command,
-                    env=clean_env,
-                    check=True,
-                    capture_output=True,
-                    text=True,
-                    timeout=20  
-                )
-                
-                safe_files.append(file_path)
+        safe_files: List[Path] = [file_path for file_path, is_safe in zip(all_files, results) if is_safe]
+        bad_count = len(all_files) - len(safe_files)
 
-            except subprocess.TimeoutExpired:
-                bad_files.append(file_path)
-                logger.warning_print(f"File diabaikan (Timeout): {file_name}")
+        logger.info_print(f"--- Pengecekan Selesai: {len(safe_files)} AMAN, {bad_count} GAGAL ---")
+        return safe_files
 
-            except subprocess.CalledProcessError as e:
-                bad_files.append(file_path)
-                logger.warning_print(f"File diabaikan (Crash): {file_name} | Error: {e.stderr[:100]}...")
-                
-            except FileNotFoundError:
-                logger.error_print(f"PyCG executable not found at '{settings.PYCG_PYTHON_EXECUTABLE}'.")
-                raise
+    def _is_pycg_safe_file(self, file_path: Path, clean_env: Dict[str, str]) -> bool:
+        """Mengecek SATU file dengan pycg. True jika selesai tanpa timeout/crash."""
+        file_name = os.path.basename(file_path)
+
+        # Perintah untuk mengecek SATU file
+        # Kita tidak butuh output-nya, jadi kita tidak pakai '--output'
+        check_command = [
+            settings.PYCG_PYTHON_EXECUTABLE,
+            "-m", "pycg",
+            str(file_path),  # <-- Hanya SATU file
+            "--package", str(self.repo_path)
+        ]
+        
+        try:
+            subprocess.run(
+                check_command,
+                env=clean_env,
+                check=True,
+                capture_output=True,
+                text=True,
+                timeout=20  
+            )
+            return True
 
-        logger.info_print(f"--- Pengecekan Selesai: {len(safe_files)} AMAN, {len(bad_files)} GAGAL ---")
-        return safe_files
+        except subprocess.TimeoutExpired:
+            logger.warning_print(f"File diabaikan (Timeout): {file_name}")
+            return False
+
+        except subprocess.CalledProcessError as e:
+            logger.warning_print(f"File diabaikan (Crash): {file_name} | Error: {e.stderr[:100]}...")
+            return False
+            
+        except FileNotFoundError:
+            logger.error_print(f"PyCG executable not found at '{settings.PYCG_PYTHON_EXECUTABLE}'.")
+            raise
     
     def resolve(self, relevant_files: List[Path]) -> None:
         logger.info_print("\nResolving dependencies using an primary method...")
@@ -786,12 +812,12 @@ class PrimaryDependencyResolver(DependencyResolver):
                             class_comp = self.components.get(class_path)
                             
                             if class_comp and class_comp.component_type == "class":
-                                component.depends_on.add(class_path)
+                                component.depends_on.add(sys.intern(class_path))
                             else:
-                                component.depends_on.add(normalized_callee)
+                                component.depends_on.add(sys.intern(normalized_callee))
                         else:
                             # If not init
-                            component.depends_on.add(normalized_callee)
+                            component.depends_on.add(sys.intern(normalized_callee))
 
         logger.info_print("Finished mapping PyCG results.")
         
@@ -823,9 +849,7 @@ class PrimaryDependencyResolver(DependencyResolver):
         
         # --- Cek Jenis 1 (Top-level code) ---
         try:
-            with open(module_path, "r", encoding="utf-8") as f:
-                source = f.read()
-            mod_tree = ast.parse(source, filename=module_path)
+            mod_tree = self._get_parsed_tree(module_path)
             
             for node in mod_tree.body:
                 # Cek definisi (def, class, var)
@@ -883,9 +907,7 @@ class PrimaryDependencyResolver(DependencyResolver):
             return set() # Batas kedalaman tercapai
 
         try:
-            with open(entry_file_path, "r", encoding="utf-8") as f:
-                source = f.read()
-            entry_tree = ast.parse(source, filename=entry_file_path)
+            entry_tree = self._get_parsed_tree(entry_file_path)
         except Exception as e:
             return set()
 
@@ -1043,9 +1065,7 @@ class PrimaryDependencyResolver(DependencyResolver):
         """
         
         try:
-            with open(entry_file_path, "r", encoding="utf-8") as f:
-                source = f.read()
-            entry_tree = ast.parse(source, filename=entry_file_path)
+            entry_tree = self._get_parsed_tree(entry_file_path)
         except Exception as e:
             logger.info_print(f"Error parsing entry file {entry_file_path}: {e}")
             return None
@@ -1375,7 +1395,7 @@ class AlternativeDependencyResolver(DependencyResolver):
                         # === special steps end ===
                     
                     if normalized_callee != component.id:
-                        component.depends_on.add(normalized_callee)
+                        component.depends_on.add(sys.intern(normalized_callee))
 
         logger.info_print("Finished mapping PyCG results.")
         
@@ -1385,63 +1405,44 @@ class V1PrimaryDependencyResolver(DependencyResolver):
     (Ini adalah logika dari kode Anda saat ini)
     """
     def resolve(self, relevant_files: List[Path]) -> None:
+        # Nama root paket/modul repo (segmen pertama tiap module path), dibangun
+        # sekali setelah first pass. Dengan ini 'pkg.sub.x' tetap dikenali walau
+        # 'pkg' sendiri bukan modul (misal paket tanpa file di root).
+        self._module_roots = {module.partition(".")[0] for module in self.modules}
+        # Cache simbol wildcard hanya untuk resolve ini, agar modul repo lain
+        # dengan nama yang sama tidak ikut terpakai
+        wildcard_cache: Dict[str, Dict[str, str]] = {}
+
+        # Kelompokkan komponen per file: satu parse (dari cache) dan satu
+        # ImportCollector per file, bukan per komponen
+        components_by_file: Dict[str, List[CodeComponent]] = defaultdict(list)
         for component_id, component in self.components.items():
-            file_path = component.file_path
-
             if component.component_type != "function" or component.id.split(".")[-1] != "main" or component.id.split(".")[-2] != "main":
                 continue
+            components_by_file[component.file_path].append(component)
 
+        for file_path, file_components in components_by_file.items():
             try:
-                with open(file_path, "r", encoding="utf-8") as f:
-                    source = f.read()
-                
-                # Parse file to get imports
-                tree = ast.parse(source)
-                
-                # Add parent field to AST nodes for easier traversal
-                add_parent_to_nodes(tree)
-                
-                # Collect imports
-                import_collector = ImportCollector()
-                import_collector.visit(tree)
+                # Ambil AST file (dipakai ulang dari first pass, di-parse jika belum ada)
+                tree = self._get_parsed_tree(file_path)
+            except (SyntaxError, UnicodeDecodeError) as e:
+                logger.warning_print(f"Error analyzing dependencies in {file_path}: {e}")
+                continue
+
+            # Collect imports
+            import_collector = ImportCollector()
+            import_collector.visit(tree)
+
+            # Semua komponen dalam satu file berbagi module path yang sama
+            module_path = file_to_module_path(file_components[0].relative_path)
 
+            for component in file_components:
                 print(f"\nComponent {component.id} depends on: {import_collector.imports}\n LEN: {len(import_collector.imports)}\n")
                 print(f"\nComponent {component.id} depends on: {import_collector.wildcard_modules}\n LEN: {len(import_collector.wildcard_modules)}\n")
 
-                # Find the component node in the tree
-                component_node = None
-                module_path = file_to_module_path(component.relative_path)
+                # Node AST sudah disimpan di komponen saat first pass
+                component_node = component.node
 
-                if component.component_type == "function":
-                    # Find top-level function
-                    for node in ast.iter_child_nodes(tree):
-                        if (isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)) 
-                                and node.name == component.id.split(".")[-1]):
-                            component_node = node
-                            break
-                
-                elif component.component_type == "class":
-                    # Find class
-                    for node in ast.iter_child_nodes(tree):
-                        if isinstance(node, ast.ClassDef) and node.name == component.id.split(".")[-1]:
-                            component_node = node
-                            break
-                
-                elif component.component_type == "method":
-                    # Find method inside class
-                    class_name, method_name = component.id.split(".")[-2:]
-                    class_node = None
-                    
-                    for node in ast.iter_child_nodes(tree):
-                        if isinstance(node, ast.ClassDef) and node.name == class_name:
-                            class_node = node
-                            for item in node.body:
-                                if (isinstance(item, (ast.FunctionDef, ast.AsyncFunctionDef)) 
-                                        and item.name == method_name):
-                                    component_node = item
-                                    break
-                            break
-                
                 if component_node:
                     # Collect dependencies for this specific component
                     dependency_collector = DependencyCollector(
@@ -1449,7 +1450,10 @@ class V1PrimaryDependencyResolver(DependencyResolver):
                         import_collector.wildcard_modules,
                         module_path,
                         self.modules,
-                        repo_path=self.repo_path
+                        repo_path=self.repo_path,
+                        known_components=self.components,
+                        module_prefixes=self._module_roots,
+                        wildcard_cache=wildcard_cache
                     )
                     
                     # For functions and methods, collect variables defined in the function
@@ -1462,14 +1466,5 @@ class V1PrimaryDependencyResolver(DependencyResolver):
 
                     print(f"\nHasil Secondary : {component.id} depends on: {dependency_collector.dependencies}\n LEN: {len(dependency_collector.dependencies)}\n")
                     
-                    # Add dependencies to the component
+                    # Add dependencies to the component (sudah difilter oleh collector)
                     component.depends_on.update(dependency_collector.dependencies)
-                    
-                    # Filter out non-existent dependencies
-                    component.depends_on = {
-                        dep for dep in component.depends_on 
-                        if dep in self.components or dep.split(".", 1)[0] in self.modules
-                    }
-                
-            except (SyntaxError, UnicodeDecodeError) as e:
-                logger.warning_print(f"Error analyzing dependencies in {file_path}: {e}")
\ No newline at end of file
@@ -209,8 +209,6 @@ async def generate_documentation_for_project(source_file_path: Path, task_id: st
             # if component_id in limited_component:
             documentation = generate_documentation_for_component(component, orchestrator)
             parser.add_component_generated_doc(component_id, documentation, metadata)
-            # Save to database 
-            parser.save_record_to_database(record_code=task_id, metadata=metadata, name=analyze_name)
             
         
         # generate dependency graph visual
@@ -222,6 +220,8 @@ async def generate_documentation_for_project(source_file_path: Path, task_id: st
         parser.add_component_dependency_graph_urls(successful_rendered_component_ids, task_id)
         
         # 8. SAVE DATABASE
+        # Satu-satunya penulisan record: setiap komponen ditulis sekali setelah
+        # seluruh dokumentasi dan URL graph lengkap
         parser.save_record_to_database(record_code=task_id, metadata=metadata, name=analyze_name)
         
         # --- COMPLETED ---
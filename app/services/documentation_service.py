@@ -1,4 +1,5 @@
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Iterator
+from pymongo.cursor import Cursor
 from app.core.mongo_client import get_db 
 from app.schemas.models.code_component_schema import CodeComponent
 
@@ -28,9 +29,94 @@ def get_all_documentations_from_db(
         print(f"[DB ERROR] Gagal mengambil semua data: {e}")
         return []
 
+# Projection untuk hidrasi komponen: hanya field yang dibaca oleh CodeComponent.from_dict.
+# 'name' dan 'meta_information' milik record tidak ikut di-decode dari BSON.
+COMPONENT_HYDRATION_PROJECTION: Dict[str, int] = {
+    "components.id": 1,
+    "components.component_type": 1,
+    "components.file_path": 1,
+    "components.relative_path": 1,
+    "components.component_parents": 1,
+    "components.depends_on": 1,
+    "components.used_by": 1,
+    "components.docgen_final_state": 1,
+    "components.component_signature": 1,
+    "components.start_line": 1,
+    "components.end_line": 1,
+    "components.has_docstring": 1,
+    "components.docstring": 1,
+    "components.dependency_graph_url": 1,
+}
+
+def get_components_collection_name(collection: str) -> str:
+    """Nama koleksi yang menyimpan komponen (satu dokumen per komponen) dari koleksi record."""
+    return f"{collection}_components"
+
+def ensure_component_indexes(collection: str = "documentation_results") -> None:
+    """Membuat index koleksi komponen (dipanggil sekali saat startup aplikasi)."""
+    db = get_db()
+    db[get_components_collection_name(collection)].create_index([("record_code", 1), ("component_order", 1)])
+
+def _find_record_components(
+    db, collection: str, record_code: str,
+    projection: Optional[Dict[str, Any]] = None,
+    component_count: Optional[int] = None
+    ) -> Cursor:
+    """
+    Cursor (lazy) atas komponen sebuah record di koleksi komponen, urut sesuai urutan
+    simpan. Projection 'components.<field>' milik record dipetakan ke '<field>';
+    field internal (_id, record_code, component_order) tidak dikembalikan.
+    Jika component_count diketahui, hanya komponen dengan urutan di bawahnya yang
+    diambil, sehingga sisa komponen lama yang belum terhapus tidak ikut terbaca.
+    """
+    component_fields = {
+        key.split(".", 1)[1]: value
+        for key, value in (projection or {}).items()
+        if key.startswith("components.")
+    }
+    if component_fields:
+        component_projection = {"_id": 0, **component_fields}
+    else:
+        component_projection = {"_id": 0, "record_code": 0, "component_order": 0}
+
+    component_filter: Dict[str, Any] = {"record_code": record_code}
+    if component_count is not None:
+        component_filter["component_order"] = {"$lt": component_count}
+
+    return db[get_components_collection_name(collection)].find(
+        component_filter, component_projection
+    ).sort("component_order", 1)
+
+def _load_record_components(
+    db, collection: str, record_code: str,
+    projection: Optional[Dict[str, Any]] = None,
+    component_count: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+    """Seluruh komponen sebuah record sebagai list (lihat _find_record_components)."""
+    return list(_find_record_components(db, collection, record_code, projection, component_count))
+
+def iter_record_components(
+    record_code: str, collection: str = "documentation_results"
+    ) -> Optional[Iterator[Dict[str, Any]]]:
+    """
+    Iterator komponen sebuah record tanpa memuat semuanya ke memori: record format
+    baru dibaca lewat cursor koleksi komponen, record lama (embedded) dari dokumennya.
+    Mengembalikan None jika record tidak ada. Error database TIDAK ditangkap,
+    agar pemanggil bisa membedakannya dari record yang tidak ditemukan.
+    """
+    db = get_db()
+    record_document = db[collection].find_one({"_id": record_code}, {"components": 1, "component_count": 1})
+    if record_document is None:
+        return None
+
+    if "components" in record_document:
+        return iter(record_document["components"])
+    return iter(_find_record_components(db, collection, record_code, component_count=record_document.get("component_count")))
+
 def get_record_from_database(
     record_code: str, collection: str = "documentation_results",
-    sidebar_mode: bool = False
+    sidebar_mode: bool = False,
+    projection: Optional[Dict[str, Any]] = None
     ) -> Optional[Dict[str, Any]]:
     
     # 1. Operasi Database (find_one)
@@ -38,8 +124,31 @@ def get_record_from_database(
     try:
         db = get_db()
         collection_obj = db[collection]
-        print(collection_obj)
-        record_document = collection_obj.find_one({"_id": record_code})
+        # Record format baru tidak menyimpan komponen di dalam dokumen induk,
+        # melainkan di koleksi komponen. Record lama (embedded) tetap terbaca apa adanya.
+        # Komponen hanya dimuat jika tanpa projection atau 'components*' di-include;
+        # projection exclusion seperti {"components": 0} tidak memuatnya.
+        wants_components = projection is None or any(
+            key.startswith("components") and value for key, value in projection.items()
+        )
+
+        # component_count ikut diambil untuk membatasi komponen yang dibaca
+        # (hanya pada projection inclusion, karena exclusion sudah mengembalikannya)
+        query_projection = projection
+        added_component_count = (
+            projection is not None and wants_components and "component_count" not in projection
+        )
+        if added_component_count:
+            query_projection = {**projection, "component_count": 1}
+
+        record_document = collection_obj.find_one({"_id": record_code}, query_projection)
+
+        if record_document and "components" not in record_document and wants_components:
+            record_document["components"] = _load_record_components(
+                db, collection, record_code, projection, record_document.get("component_count")
+            )
+        if record_document and added_component_count:
+            record_document.pop("component_count", None)
             
     except Exception as e:
         print(f"[DB ERROR] Gagal mengambil data record '{record_code}': {e}")